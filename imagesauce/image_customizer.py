@@ -1,10 +1,17 @@
+import contextlib
+import ctypes
+import errno
+import fcntl
+import json
 import os
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import logging
 from argparse import Namespace
 import sys
+import time
 from typing import Optional
 from imagesauce import snap_seed_parse
 from chimg.chroot import Chroot
@@ -12,6 +19,265 @@ from chimg.context import Context
 
 logger = logging.getLogger(__name__)
 
+# ioctl to clone (reflink) a whole file on CoW filesystems like btrfs/xfs
+FICLONE = 0x40049409
+
+# buffer size for the fallback copy loop and for large sequential writes;
+# ~1 MiB buffers beat the 8 KiB default by a wide margin for multi-MB files
+IO_BUFFER_SIZE = 1 << 20
+
+# partition types holding a Linux filesystem: MBR id and GPT type GUID
+LINUX_PARTITION_TYPES = ("83", "0FC63DAF-8483-4772-8E79-3D69D8477DE4")
+
+# magic bytes at the start of every qcow2 image ("QFI\xfb")
+QCOW2_MAGIC = b"QFI\xfb"
+
+# resolved once at import so create_manifest does not rescan PATH
+_CPC_SBOM = shutil.which("cpc-sbom")
+
+# loop device ioctls from <linux/loop.h>
+LOOP_SET_FD = 0x4C00
+LOOP_CLR_FD = 0x4C01
+LOOP_SET_STATUS64 = 0x4C04
+LOOP_CTL_GET_FREE = 0x4C82
+
+# mount(2) flags: skip access-time updates, which otherwise turn the
+# read-mostly manifest/filelist walk into one write per inode touched
+MS_NOATIME = 1024
+MS_NODIRATIME = 2048
+
+# umount2(2) flag: detach now, clean up when the last reference drops
+MNT_DETACH = 2
+
+# ioctl from <linux/fs.h> to set block device readahead, in 512-byte sectors
+BLKRASET = 0x1262
+
+_LIBC = ctypes.CDLL("libc.so.6", use_errno=True)
+
+
+class _LoopInfo64(ctypes.Structure):
+    """struct loop_info64 from <linux/loop.h>, used with LOOP_SET_STATUS64."""
+
+    _fields_ = [
+        ("lo_device", ctypes.c_uint64),
+        ("lo_inode", ctypes.c_uint64),
+        ("lo_rdevice", ctypes.c_uint64),
+        ("lo_offset", ctypes.c_uint64),
+        ("lo_sizelimit", ctypes.c_uint64),
+        ("lo_number", ctypes.c_uint32),
+        ("lo_encrypt_type", ctypes.c_uint32),
+        ("lo_encrypt_key_size", ctypes.c_uint32),
+        ("lo_flags", ctypes.c_uint32),
+        ("lo_file_name", ctypes.c_uint8 * 64),
+        ("lo_crypt_name", ctypes.c_uint8 * 64),
+        ("lo_encrypt_key", ctypes.c_uint8 * 32),
+        ("lo_init", ctypes.c_uint64 * 2),
+    ]
+
+
+def _dpkg_status_packages(status_file: str):
+    """Yield (package, architecture, multi_arch_same, version) for every installed package.
+
+    The tuple order sorts like dpkg-query's output (package name, then
+    architecture); multi_arch_same tells the caller to arch-qualify the name
+    the way dpkg-query's ${binary:Package} does for Multi-Arch: same packages.
+    """
+    with open(status_file) as fh:
+        for stanza in fh.read().split("\n\n"):
+            package = version = status = architecture = multi_arch = None
+            for line in stanza.splitlines():
+                if line.startswith("Package:"):
+                    package = line[len("Package:") :].strip()  # noqa: E203
+                elif line.startswith("Version:"):
+                    version = line[len("Version:") :].strip()  # noqa: E203
+                elif line.startswith("Status:"):
+                    status = line[len("Status:") :].strip()  # noqa: E203
+                elif line.startswith("Architecture:"):
+                    architecture = line[len("Architecture:") :].strip()  # noqa: E203
+                elif line.startswith("Multi-Arch:"):
+                    multi_arch = line[len("Multi-Arch:") :].strip()  # noqa: E203
+            if package and version and status and status.split()[-1] == "installed":
+                yield package, architecture or "", multi_arch == "same", version
+
+
+def _drop_page_cache(path: str | Path) -> None:
+    """Ask the kernel to drop cached pages for the given file (best effort)."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _qemu_img_preexec() -> None:
+    """Runs in the qemu-img child between fork and exec.
+
+    Opens the affinity mask up to every CPU (the child should not inherit any
+    narrowed mask from the parent) and bumps scheduling priority so the
+    convert's coroutine pool wins contention against the idle, waiting parent.
+    """
+    os.sched_setaffinity(0, range(os.cpu_count() or 1))
+    try:
+        os.nice(-5)
+    except OSError:
+        pass  # lacking CAP_SYS_NICE is not fatal
+
+
+def _attach_loop_device(image_file: str | Path, offset: int) -> str:
+    """
+    Attach image_file to a free loop device at the given byte offset.
+
+    Returns the loop device path (e.g. /dev/loop3). The attachment persists
+    after the fds are closed; detach with _detach_loop_device.
+    """
+    ctl_fd = os.open("/dev/loop-control", os.O_RDWR)
+    try:
+        index = fcntl.ioctl(ctl_fd, LOOP_CTL_GET_FREE)
+    finally:
+        os.close(ctl_fd)
+
+    loop_device = f"/dev/loop{index}"  # noqa: E231
+    image_fd = os.open(str(image_file), os.O_RDWR)
+    try:
+        loop_fd = os.open(loop_device, os.O_RDWR)
+        try:
+            fcntl.ioctl(loop_fd, LOOP_SET_FD, image_fd)
+            info = _LoopInfo64()
+            info.lo_offset = offset
+            encoded_name = str(image_file).encode()[:63]
+            info.lo_file_name[: len(encoded_name)] = list(encoded_name)
+            try:
+                fcntl.ioctl(loop_fd, LOOP_SET_STATUS64, bytes(info))
+            except OSError:
+                fcntl.ioctl(loop_fd, LOOP_CLR_FD)
+                raise
+        finally:
+            os.close(loop_fd)
+    finally:
+        os.close(image_fd)
+    return loop_device
+
+
+def _find_free_nbd_device() -> Optional[str]:
+    """Return the first NBD device node without a connected server, or None."""
+    for index in range(16):
+        device = f"/dev/nbd{index}"  # noqa: E231
+        if not os.path.exists(device):
+            break
+        if not os.path.exists(f"/sys/block/nbd{index}/pid"):  # noqa: E231
+            return device
+    return None
+
+
+def _detach_loop_device(loop_device: str) -> None:
+    loop_fd = os.open(loop_device, os.O_RDWR)
+    try:
+        fcntl.ioctl(loop_fd, LOOP_CLR_FD)
+    finally:
+        os.close(loop_fd)
+
+
+def _set_readahead(device: str, sectors: int = 8192) -> None:
+    """Raise the block device readahead window (best effort).
+
+    The sequential chroot walks in create_manifest benefit from a larger
+    window than the 256-sector default.
+    """
+    try:
+        fd = os.open(device, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        fcntl.ioctl(fd, BLKRASET, sectors)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _mount(source: str, target: str | Path, fstype: str = "ext4", flags: int = MS_NOATIME | MS_NODIRATIME) -> None:
+    """Call mount(2) directly via libc instead of forking sudo + mount."""
+    ret = _LIBC.mount(source.encode(), str(target).encode(), fstype.encode(), flags, None)
+    if ret != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, f"mount of {source} on {target} failed: {os.strerror(err)}")
+
+
+def _umount(target: str | Path, flags: int = MNT_DETACH) -> None:
+    """Call umount2(2) directly via libc."""
+    ret = _LIBC.umount2(str(target).encode(), flags)
+    if ret != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, f"umount of {target} failed: {os.strerror(err)}")
+
+
+def _fast_copy(src: str | Path, dst: str | Path) -> None:
+    """
+    Copy a file using the fastest mechanism the kernel/filesystem supports.
+
+    Tries os.copy_file_range (server-side copy / reflink), then a FICLONE
+    reflink ioctl, then os.sendfile, and finally a plain 1 MiB read/write
+    loop. All of these avoid bouncing every byte through a small user-space
+    buffer the way shutil.copy does, which matters for multi-GB raw images.
+    """
+    size = os.stat(src).st_size
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        sfd = fsrc.fileno()
+        dfd = fdst.fileno()
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                copied = 0
+                while copied < size:
+                    n = os.copy_file_range(sfd, dfd, size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+                if copied >= size:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EINVAL):
+                    raise
+                logger.debug("copy_file_range unavailable (%s), falling back", e)
+
+        try:
+            fcntl.ioctl(dfd, FICLONE, sfd)
+            return
+        except OSError as e:
+            logger.debug("FICLONE reflink unavailable (%s), falling back", e)
+
+        try:
+            # discard any partial progress from the attempts above: sendfile
+            # reads from an explicit offset but writes at dfd's current one
+            os.lseek(dfd, 0, os.SEEK_SET)
+            fdst.truncate(0)
+            copied = 0
+            while copied < size:
+                n = os.sendfile(dfd, sfd, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            if copied >= size:
+                return
+        except OSError as e:
+            logger.debug("sendfile unavailable (%s), falling back", e)
+
+        os.lseek(sfd, 0, os.SEEK_SET)
+        os.lseek(dfd, 0, os.SEEK_SET)
+        fdst.truncate(0)
+        buf = bytearray(IO_BUFFER_SIZE)
+        view = memoryview(buf)
+        while True:
+            n = fsrc.readinto(buf)
+            if not n:
+                break
+            fdst.write(view[:n])
+
 
 class ImageCustomizer:
     def __init__(
@@ -22,6 +288,8 @@ class ImageCustomizer:
         target_mount_point: str | Path,
         chimg_config_file: str | Path,
         overwrite: bool = False,
+        num_coroutines: int = 16,
+        use_io_uring: bool = False,
     ):
         """
         Initialize the ImageCustomizer with the input image file, output image path, and target mount point."
@@ -32,17 +300,25 @@ class ImageCustomizer:
             target_mount_point (str | Path): The mount point for the image.
             chimg_config_file (str | Path): The path to the chimg config file.
             overwrite (bool): Whether to overwrite existing output image files.
+            num_coroutines (int): Number of parallel coroutines qemu-img uses when converting images.
+            use_io_uring (bool): Read the source image through qemu's io_uring AIO backend with the
+                page cache bypassed. Requires QEMU 5.0+ and a filesystem that supports O_DIRECT.
         """
         self.input_image_file = Path(input_image_file)
         self.output_image_path = Path(output_image_path)
         self.target_mount_point = Path(target_mount_point)
         self.chimg_config_file = Path(chimg_config_file)
         self.overwrite = overwrite
+        self.num_coroutines = num_coroutines
+        self.use_io_uring = use_io_uring
 
         self.modified_image_file = self.input_image_file.with_suffix(".modifying")
         self.output_files_name = self.output_image_path.with_suffix("")
         self.input_image_type = ""
         self.resolv_conf_existed = False
+        self.loop_device: Optional[str] = None
+        self.nbd_device: Optional[str] = None
+        self.use_nbd = False
 
         # Check if the output image file already exists
         if os.path.exists(self.output_image_path) and not self.overwrite:
@@ -57,7 +333,7 @@ class ImageCustomizer:
         os.makedirs(self.target_mount_point, exist_ok=True)
 
     def _remove_existing_modified_image(self):
-        if os.path.exists(self.modified_image_file):
+        with contextlib.suppress(FileNotFoundError):
             os.remove(self.modified_image_file)
             logger.info("Removed existing modified image file")
 
@@ -65,46 +341,133 @@ class ImageCustomizer:
         if not os.path.isfile(self.input_image_file):
             raise FileNotFoundError(f"Error: Input image file '{self.input_image_file}' not found!")
 
-    def _convert_or_copy_image(self):
-        file_info = subprocess.check_output(["file", self.input_image_file]).decode()
-        if "QCOW" in file_info:
-            logger.info("Converting input qcow2 image to raw image...")
-            subprocess.run(
-                ["qemu-img", "convert", "-f", "qcow2", "-O", "raw", self.input_image_file, self.modified_image_file],
-                check=True,
+    def _nbd_usable(self) -> bool:
+        if shutil.which("qemu-nbd") is None:
+            return False
+        if not os.path.exists("/dev/nbd0"):
+            # best effort: the nbd module may simply not be loaded yet
+            subprocess.run(["modprobe", "nbd"], check=False)
+        return _find_free_nbd_device() is not None
+
+    def _qemu_img_convert(self, source_format: str, target_format: str, source: Path, target: Path) -> None:
+        argv = ["qemu-img", "convert", "-p", "-m", str(self.num_coroutines), "-W"]
+        if self.use_io_uring:
+            # qemu-img only exposes the io_uring AIO backend through image-opts
+            argv.append("--image-opts")
+            source_arg = (
+                f"driver={source_format},file.driver=file,file.filename={source},"  # noqa: E231
+                "file.aio=io_uring,file.cache.direct=on"
             )
+        else:
+            argv += ["-f", source_format]
+            source_arg = str(source)
+        argv += ["-O", target_format]
+        if target_format == "qcow2":
+            argv += ["-o", "preallocation=metadata"]
+        argv += [source_arg, str(target)]
+        subprocess.run(argv, check=True, preexec_fn=_qemu_img_preexec)
+
+    def _convert_or_copy_image(self):
+        # the qcow2 magic in the first 4 bytes is all file(1) would tell us
+        with open(self.input_image_file, "rb") as f:
+            magic = f.read(len(QCOW2_MAGIC))
+        if magic == QCOW2_MAGIC:
+            self.use_nbd = self._nbd_usable()
+            if self.use_nbd:
+                logger.info("Copying qcow2 image for in-place modification via qemu-nbd...")
+                _fast_copy(self.input_image_file, self.modified_image_file)
+            else:
+                logger.info("qemu-nbd unavailable. Converting input qcow2 image to raw image...")
+                self._qemu_img_convert("qcow2", "raw", self.input_image_file, self.modified_image_file)
             self.input_image_type = "qcow2"
         else:
             logger.info("Image is already raw. Copying to %s", self.modified_image_file)
-            shutil.copy(self.input_image_file, self.modified_image_file)
+            _fast_copy(self.input_image_file, self.modified_image_file)
             self.input_image_type = "raw"
+        # GBs of cold image pages now sit in the page cache; drop them so the
+        # manifest/SBOM stage keeps its hot chroot metadata cached instead
+        _drop_page_cache(self.input_image_file)
+        _drop_page_cache(self.modified_image_file)
         logger.info("Converted or copied image for modifying to: %s", self.modified_image_file)
 
     def _get_partition_offset(self):
-        fdisk_output = subprocess.check_output(["fdisk", "-l", self.modified_image_file]).decode()
-        start_sector = next((line.split()[1] for line in fdisk_output.splitlines() if "Linux filesystem" in line), None)
-        sector_size_line = next((line for line in fdisk_output.splitlines() if "Sector size" in line), None)
-        sector_size = sector_size_line.split()[3] if sector_size_line else None
+        table = json.loads(subprocess.check_output(["sfdisk", "--json", str(self.modified_image_file)]))[
+            "partitiontable"
+        ]
+        sector_size = table.get("sectorsize", 512)
+        partition = next(
+            (p for p in table.get("partitions", []) if p.get("type", "").upper() in LINUX_PARTITION_TYPES),
+            None,
+        )
 
-        if not start_sector or not sector_size:
+        if partition is None:
             raise RuntimeError("Error: Could not determine partition offset!")
 
-        offset = int(start_sector) * int(sector_size)
+        offset = partition["start"] * sector_size
         return offset
 
-    def _mount_image(self, offset):
-        result = subprocess.run(
+    def _attach_qcow2_nbd(self):
+        self.nbd_device = _find_free_nbd_device()
+        if self.nbd_device is None:
+            raise RuntimeError("Error: No free NBD device available!")
+        logger.info("Attaching %s to %s via qemu-nbd...", self.modified_image_file, self.nbd_device)
+        subprocess.run(
             [
-                "sudo",
-                "mount",
-                "-o",
-                f"loop,offset={offset}",  # noqa: E231
-                self.modified_image_file,
-                self.target_mount_point,
-            ]
+                "qemu-nbd",
+                f"--connect={self.nbd_device}",  # noqa: E231
+                "--cache=none",
+                "--aio=native",
+                str(self.modified_image_file),
+            ],
+            check=True,
         )
-        if result.returncode != 0:
-            raise RuntimeError("Error: Failed to mount the image.")
+        try:
+            subprocess.run(["partprobe", self.nbd_device], check=True)
+        except Exception:
+            self._disconnect_nbd(check=False)
+            raise
+
+    def _disconnect_nbd(self, check: bool = True):
+        if self.nbd_device is not None:
+            subprocess.run(["qemu-nbd", f"--disconnect={self.nbd_device}"], check=check)  # noqa: E231
+            self.nbd_device = None
+
+    def _get_nbd_partition(self):
+        table = json.loads(subprocess.check_output(["sfdisk", "--json", self.nbd_device]))["partitiontable"]
+        partition = next(
+            (p for p in table.get("partitions", []) if p.get("type", "").upper() in LINUX_PARTITION_TYPES),
+            None,
+        )
+
+        if partition is None:
+            raise RuntimeError("Error: Could not find a Linux partition on the NBD device!")
+
+        return partition["node"]
+
+    def _mount_nbd_partition(self):
+        try:
+            partition = self._get_nbd_partition()
+            _set_readahead(self.nbd_device)
+            try:
+                _mount(partition, self.target_mount_point)
+            except OSError as e:
+                raise RuntimeError("Error: Failed to mount the image.") from e
+        except Exception:
+            # do not leave /dev/nbdX attached if anything after connect fails
+            self._disconnect_nbd(check=False)
+            raise
+        logger.info("Mounted successfully at %s", self.target_mount_point)
+
+    def _mount_image(self, offset):
+        self.loop_device = _attach_loop_device(self.modified_image_file, offset)
+        logger.debug("Attached %s to %s at offset %d", self.modified_image_file, self.loop_device, offset)
+        _set_readahead(self.loop_device)
+        try:
+            _mount(self.loop_device, self.target_mount_point)
+        except OSError as e:
+            _detach_loop_device(self.loop_device)
+            self.loop_device = None
+            raise RuntimeError("Error: Failed to mount the image.") from e
         logger.info("Mounted successfully at %s", self.target_mount_point)
 
     def _handle_resolv_conf(self):
@@ -115,56 +478,73 @@ class ImageCustomizer:
         if os.path.lexists(resolv_path):  # works for symlinks too
             logger.info("Backing up existing resolv.conf (may be a symlink)")
             try:
-                subprocess.run(["sudo", "cp", "-a", resolv_path, backup_path], check=True)
+                os.rename(resolv_path, backup_path)
                 self.resolv_conf_existed = True
-            except subprocess.CalledProcessError:
+            except OSError:
                 logger.warning("Failed to backup resolv.conf. Proceeding without backup.")
                 self.resolv_conf_existed = False
-
-            subprocess.run(["sudo", "rm", "-f", resolv_path], check=True)
+                os.unlink(resolv_path)
 
         # Always replace with host's resolv.conf as regular file
-        subprocess.run(["sudo", "cp", "/etc/resolv.conf", resolv_path], check=True)
-        subprocess.run(["sudo", "ls", "-l", resolv_path])
+        shutil.copyfile("/etc/resolv.conf", resolv_path)
 
     def _restore_resolv_conf(self):
         resolv_path = os.path.join(self.target_mount_point, "etc", "resolv.conf")
         backup_path = f"{resolv_path}.bak"
 
-        if self.resolv_conf_existed and os.path.exists(backup_path):
+        if self.resolv_conf_existed and os.path.lexists(backup_path):
             logger.info("Restoring original resolv.conf")
-            subprocess.run(["sudo", "rm", "-f", resolv_path], check=True)
-            subprocess.run(["sudo", "mv", backup_path, resolv_path], check=True)
+            os.replace(backup_path, resolv_path)
         else:
             logger.info("Removing temporary resolv.conf")
-            subprocess.run(["sudo", "rm", "-f", resolv_path], check=True)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(resolv_path)
 
     def _unmount_image(self):
         logger.info("Unmounting image...")
-        subprocess.run(["sudo", "umount", self.target_mount_point], check=True)
-        subprocess.run(["sleep", "1"])
+        _umount(self.target_mount_point)
+        # wait for the mountpoint to actually go away (normally immediate
+        # with MNT_DETACH) instead of burning a fixed second
+        for _ in range(20):
+            if not os.path.ismount(self.target_mount_point):
+                break
+            time.sleep(0.05)
+        if self.loop_device is not None:
+            _detach_loop_device(self.loop_device)
+            self.loop_device = None
+        self._disconnect_nbd()
 
     def _produce_final_image(self):
-        if os.path.exists(self.output_image_path):
+        with contextlib.suppress(FileNotFoundError):
             os.remove(self.output_image_path)
             logger.info("Removed existing output image file")
 
-        if self.input_image_type == "qcow2":
+        if self.use_nbd:
+            # changes already landed in the qcow2 copy via the NBD mount, so
+            # no second convert is needed: just move it into place
+            logger.info("Moving modified qcow2 image to: %s", self.output_image_path)
+            try:
+                os.replace(self.modified_image_file, self.output_image_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                _fast_copy(self.modified_image_file, self.output_image_path)
+                os.remove(self.modified_image_file)
+        elif self.input_image_type == "qcow2":
             logger.info("Converting raw image back to qcow2 at: %s", self.output_image_path)
-            subprocess.run(
-                ["qemu-img", "convert", "-f", "raw", "-O", "qcow2", self.modified_image_file, self.output_image_path],
-                check=True,
-            )
+            self._qemu_img_convert("raw", "qcow2", self.modified_image_file, self.output_image_path)
+        elif os.stat(self.modified_image_file.parent).st_dev == os.stat(self.output_image_path.parent).st_dev:
+            # same filesystem: an atomic O(1) rename beats a full copy
+            logger.info("Renaming raw image to: %s", self.output_image_path)
+            os.replace(self.modified_image_file, self.output_image_path)
         else:
             logger.info("Copying raw image to: %s", self.output_image_path)
-            shutil.copy(self.modified_image_file, self.output_image_path)
+            _fast_copy(self.modified_image_file, self.output_image_path)
 
-        # Clean up the modified image file
-        os.remove(self.modified_image_file)
-        if os.path.exists(self.modified_image_file):
-            logger.warning("Failed to remove modified image file.")
-        else:
-            logger.info("Removed temporary interim modified image file successfully.")
+        # Clean up the modified image file (the rename path already consumed it)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.modified_image_file)
+        logger.info("Removed temporary interim modified image file successfully.")
 
         logger.info("New image is available at: %s", self.output_image_path)
 
@@ -174,8 +554,12 @@ class ImageCustomizer:
         self._remove_existing_modified_image()
         self._validate_input_image_exists()
         self._convert_or_copy_image()
-        offset = self._get_partition_offset()
-        self._mount_image(offset)
+        if self.use_nbd:
+            self._attach_qcow2_nbd()
+            self._mount_nbd_partition()
+        else:
+            offset = self._get_partition_offset()
+            self._mount_image(offset)
         self._handle_resolv_conf()
         logger.info("Image customizer setup complete!")
 
@@ -211,18 +595,57 @@ class ImageCustomizer:
         manifest_file = f"{base_output_path}.manifest"
         filelist_file = f"{base_output_path}.filelist"
 
-        for file in [manifest_file, filelist_file, sbom_file_name]:
-            if os.path.exists(file) and not overwrite:
-                logger.error(f"File {file} already exists. Use --overwrite to overwrite existing files.")
-                exit(1)
-            elif os.path.exists(file) and overwrite:
-                logger.warning(f"File {file} already exists. Overwriting...")
-                os.remove(file)
+        if not overwrite:
+            # one lstat per output; the open(..., "w") calls below truncate
+            # in place, so no removal pass is needed when overwriting
+            for file in [manifest_file, filelist_file, sbom_file_name]:
+                if os.path.lexists(file):
+                    logger.error(f"File {file} already exists. Use --overwrite to overwrite existing files.")
+                    exit(1)
+        elif not generate_sbom:
+            # nothing will rewrite a stale SBOM this run, so drop it
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(sbom_file_name)
+                logger.warning(f"File {sbom_file_name} already exists. Overwriting...")
+
+        if generate_sbom and _CPC_SBOM is None:
+            # Ensure cpc-sbom is installed before the workers start
+            subprocess.run(["sudo", "snap", "install", "--classic", "--edge", "cpc-sbom"], check=True)
+
+        # The three outputs read disjoint parts of the chroot and are I/O
+        # bound, so run them concurrently and wait for all of them.
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(self._generate_package_manifest, chroot_root, manifest_file),
+                executor.submit(self._generate_filelist, chroot_root, filelist_file),
+            ]
+            if generate_sbom:
+                futures.append(
+                    executor.submit(self._generate_sbom, chroot_root, sbom_document_name, sbom_file_name, sbom_log)
+                )
+            for future in as_completed(futures):
+                future.result()
+
+        logger.info("Done creating manifest and filelist!")
 
+    def _generate_package_manifest(self, chroot_root: str, manifest_file: str) -> None:
         logger.info("Adding packages to manifest...")
-        with open(manifest_file, "w") as f:
-            subprocess.run(["dpkg-query", "--show", f"--admindir={chroot_root}/var/lib/dpkg"], stdout=f, check=True)
+        status_file = f"{chroot_root}/var/lib/dpkg/status"
+        if os.path.isfile(status_file):
+            # one pass over the status file in process: no fork, no dpkg
+            # lock contention, same name<TAB>version lines as dpkg-query
+            packages = sorted(_dpkg_status_packages(status_file))
+            with open(manifest_file, "w", buffering=IO_BUFFER_SIZE) as f:
+                for package, architecture, multi_arch_same, version in packages:
+                    if multi_arch_same:
+                        package = f"{package}:{architecture}"  # noqa: E231
+                    f.write(f"{package}\t{version}\n")
+        else:
+            with open(manifest_file, "w") as f:
+                subprocess.run(["dpkg-query", "--show", f"--admindir={chroot_root}/var/lib/dpkg"], stdout=f, check=True)
 
+        # snap_seed_parse appends to the manifest, so it has to stay
+        # serialized behind dpkg-query within this worker
         logger.info("Adding snaps to manifest...")
         logger.debug("Calling snap_seed_parse module")
         snap_seed_parse.main(
@@ -232,41 +655,46 @@ class ImageCustomizer:
         logger.debug("Finished calling snap_seed_parse module")
         logger.info("Manifest generated: %s", manifest_file)
 
+    def _generate_filelist(self, chroot_root: str, filelist_file: str) -> None:
         logger.info("Generating filelist...")
-        with open(filelist_file, "w") as f:
-            subprocess.run(["find", "-xdev"], stdout=f, check=True, cwd=chroot_root)
-        subprocess.run(["sort", "-o", filelist_file, filelist_file], check=True)
+        device = os.lstat(chroot_root).st_dev
+        paths = ["."]
+        for root, dirs, files, rootfd in os.fwalk(chroot_root, follow_symlinks=False):
+            rel = os.path.relpath(root, chroot_root)
+            prefix = "." if rel == "." else f"./{rel}"  # noqa: E231
+            paths.extend(f"{prefix}/{name}" for name in dirs)  # noqa: E231
+            paths.extend(f"{prefix}/{name}" for name in files)  # noqa: E231
+            # like find -xdev: list mount points but do not descend into them
+            dirs[:] = [d for d in dirs if os.stat(d, dir_fd=rootfd, follow_symlinks=False).st_dev == device]
+        paths.sort()
+        # stream through a large buffer instead of joining one giant string
+        with open(filelist_file, "w", buffering=IO_BUFFER_SIZE) as f:
+            for path in paths:
+                f.write(f"{path}\n")
         logger.info("Filelist generated: %s", filelist_file)
 
-        if generate_sbom:
-            # Ensure cpc-sbom is installed
-            if shutil.which("cpc-sbom") is None:
-                subprocess.run(["sudo", "snap", "install", "--classic", "--edge", "cpc-sbom"], check=True)
-
-            # Generate the SBOM
-            with open(sbom_file_name, "w") as sbom_out, open(sbom_log, "w") as sbom_err:
-                result = subprocess.run(
-                    [
-                        "cpc-sbom",
-                        "--rootdir",
-                        chroot_root,
-                        "--ignore-copyright-parsing-errors",
-                        "--ignore-copyright-file-not-found-errors",
-                        "--document-name",
-                        sbom_document_name,
-                    ],
-                    stdout=sbom_out,
-                    stderr=sbom_err,
-                )
-            if result.returncode != 0:
-                logger.error("ERROR: SBOM generation failed.")
-                with open(sbom_log, "r") as log_file:
-                    logger.debug(log_file.read())
-                exit(1)
-            else:
-                logger.info("SBOM generation succeeded!")
-
-        logger.info("Done creating manifest and filelist!")
+    def _generate_sbom(self, chroot_root: str, sbom_document_name: str, sbom_file_name: str, sbom_log: str) -> None:
+        logger.info("Generating SBOM...")
+        with open(sbom_file_name, "w") as sbom_out, open(sbom_log, "w") as sbom_err:
+            result = subprocess.run(
+                [
+                    "cpc-sbom",
+                    "--rootdir",
+                    chroot_root,
+                    "--ignore-copyright-parsing-errors",
+                    "--ignore-copyright-file-not-found-errors",
+                    "--document-name",
+                    sbom_document_name,
+                ],
+                stdout=sbom_out,
+                stderr=sbom_err,
+            )
+        if result.returncode != 0:
+            logger.error("ERROR: SBOM generation failed.")
+            with open(sbom_log, "r") as log_file:
+                logger.debug(log_file.read())
+            raise RuntimeError(f"SBOM generation failed. See log: {sbom_log}")
+        logger.info("SBOM generation succeeded!")
 
 
     def do_chrootfs(self, args) -> None: